@@ -4,6 +4,11 @@
 import json
 import os
 
+try:
+    import orjson  # Rust JSON writer; ~5-10x faster than json on big chapters
+except ImportError:
+    orjson = None
+
 chapter_path = os.path.expanduser(
     "~/Library/Application Support/PENSVM/chapters/ch-10/chapter.json"
 )
@@ -13,17 +18,23 @@ with open(chapter_path) as f:
 
 
 def get_poly_indices(toon_str):
-    """Return {word_index: (word, correct_gloss)} for polysemous words."""
+    """Yield (word_index, word, correct_gloss) for polysemous words."""
     lines = toon_str.split("\n")
-    result = {}
     for idx, line in enumerate(lines[1:]):
         if not line.strip():
             continue
-        parts = line.split(",")
-        if len(parts) > 2 and "|" in parts[2]:
-            glosses = parts[2].split("|")
-            result[idx] = (parts[0], glosses[0])
-    return result
+        # Locate the gloss field (index 2) with find() instead of splitting the
+        # whole line — most lines have no pipe, so skip them without allocating
+        # a parts list.
+        c1 = line.find(",")
+        c2 = line.find(",", c1 + 1)
+        if c1 == -1 or c2 == -1:
+            continue
+        c3 = line.find(",", c2 + 1)
+        pipe = line.find("|", c2 + 1, c3 if c3 != -1 else len(line))
+        if pipe == -1:
+            continue
+        yield idx, line[:c1], line[c2 + 1:pipe]
 
 
 # Context-aware explanations keyed by (page_index, block_index_within_page, word_text, correct_gloss)
@@ -96,8 +107,17 @@ EXPLANATIONS = {
     ("vīdē", "see"): "Imperative: directing the reader to look at chapter XI",
 }
 
+# Word-keyed index over EXPLANATIONS: word forms share one top-level entry
+# (capiunt/capit/capere etc. each probe their own word once), and lookups no
+# longer build a (word, gloss) tuple per polysemous line. Scales better than
+# the flat tuple keys as the table grows to cover more chapters.
+EXPLANATIONS_BY_WORD = {}
+for (_word, _gloss), _note in EXPLANATIONS.items():
+    EXPLANATIONS_BY_WORD.setdefault(_word, {})[_gloss] = _note
+
 total_notes = 0
 total_blocks = 0
+all_polys = 0
 
 for page in chapter["pages"]:
     for block in page["content"]:
@@ -107,32 +127,24 @@ for page in chapter["pages"]:
         if block.get("style") == "grammar-table":
             continue
 
-        polys = get_poly_indices(toon)
-        if not polys:
-            continue
-
         notes = {}
-        for idx, (word, correct) in polys.items():
-            key = (word, correct)
-            if key in EXPLANATIONS:
-                notes[str(idx)] = EXPLANATIONS[key]
+        for idx, word, correct in get_poly_indices(toon):
+            all_polys += 1
+            glosses = EXPLANATIONS_BY_WORD.get(word)
+            if glosses is not None and (note := glosses.get(correct)) is not None:
+                notes[str(idx)] = note
 
         if notes:
             block["glossNotes"] = notes
             total_notes += len(notes)
             total_blocks += 1
 
-with open(chapter_path, "w") as f:
-    json.dump(chapter, f, indent=2, ensure_ascii=False)
+if orjson is not None:
+    with open(chapter_path, "wb") as f:
+        f.write(orjson.dumps(chapter, option=orjson.OPT_INDENT_2))
+else:
+    with open(chapter_path, "w") as f:
+        json.dump(chapter, f, indent=2, ensure_ascii=False)
 
 print(f"Done! {total_notes} explanations across {total_blocks} blocks")
-# Show coverage
-all_polys = 0
-for page in chapter["pages"]:
-    for block in page["content"]:
-        toon = block.get("toon", "")
-        for line in toon.split("\n")[1:]:
-            parts = line.split(",")
-            if len(parts) > 2 and "|" in parts[2]:
-                all_polys += 1
 print(f"Coverage: {total_notes}/{all_polys} polysemous words have explanations")
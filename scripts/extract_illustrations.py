@@ -9,6 +9,8 @@ Commands (no AI - Claude provides coordinates):
 Commands (uses Gemini):
 - margin: Crop margin strip (Gemini detects boundary)
 - inline: Extract inline illustrations (Gemini detects objects)
+- page: Both margin strips + inline illustrations via one Gemini request
+- batch: Run the page pipeline over a directory of images concurrently
 
 Trimming workflow:
 - Claude reads margin image, visually determines trim coordinates
@@ -16,16 +18,86 @@ Trimming workflow:
 - Claude verifies result, adjusts if text was cut
 """
 
+import asyncio
+import atexit
+import functools
+import hashlib
+import os
 import sys
 import json
 import base64
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
 from PIL import Image
 
+try:
+    import ijson  # incremental JSON parsing of Gemini streams
+except ImportError:
+    ijson = None
+
+try:
+    import numpy as np  # vectorized box math and mask thresholding
+except ImportError:
+    np = None
+
+try:
+    import orjson  # faster Gemini response parsing; its JSONDecodeError
+except ImportError:  # subclasses json's, so except clauses need no change
+    orjson = None
+
 # Default margin ratio (used as fallback if Gemini detection fails)
 DEFAULT_MARGIN_RATIO = 0.25
 
+# PNG encoding is the slow half of a crop; hand saves to this pool so the
+# caller gets its result dict while zlib runs. Drained at exit, so the CLI
+# never terminates before its outputs are on disk.
+_io_pool = ThreadPoolExecutor(max_workers=2)
+atexit.register(_io_pool.shutdown, wait=True)
+
+
+@functools.lru_cache(maxsize=8)
+def _open_image(path: str, mtime: float) -> Image.Image:
+    """Open and fully decode an image, cached on (path, mtime).
+
+    The trimming workflow crops the same margin image repeatedly while Claude
+    refines coordinates; caching the decoded pixels makes that one decode + N
+    crops instead of N decodes. mtime invalidates the entry if the file changes.
+    """
+    image = Image.open(path)
+    image.load()
+    return image
+
+
+def _open_cached(image_path: str) -> Image.Image:
+    return _open_image(image_path, os.path.getmtime(image_path))
+
+
+def _peek_size(image_path: str) -> tuple:
+    """Read (width, height) from the image header without decoding pixels.
+
+    For size-only callers this must stay separate from _open_cached: pulling
+    the image through the decode cache just to normalize coordinates would
+    cost a full JPEG decode before any crop is even needed.
+    """
+    with Image.open(image_path) as image:
+        return image.size
+
+
+def _vips():
+    """Lazy import pyvips; returns None if libvips is unavailable.
+
+    libvips decodes on demand, so cropping a sub-rectangle of a large spread
+    scan only materializes the scanlines it needs instead of the whole image.
+    The PIL path is kept as a fallback.
+    """
+    try:
+        import pyvips
+        return pyvips
+    except ImportError:
+        return None
+
 
 # =============================================================================
 # Simple operations (no AI) - Claude provides coordinates
@@ -40,7 +112,7 @@ def get_image_info(image_path: str) -> dict:
     Returns:
         Dict with width, height, and format
     """
-    image = Image.open(image_path)
+    image = _open_cached(image_path)
     return {
         "width": image.width,
         "height": image.height,
@@ -61,7 +133,11 @@ def crop_region(image_path: str, output_path: str, x1: int, y1: int, x2: int, y2
     Returns:
         Dict with output path and dimensions
     """
-    image = Image.open(image_path)
+    vips = _vips()
+    if vips is not None:
+        image = vips.Image.new_from_file(image_path, access="sequential")
+    else:
+        image = _open_cached(image_path)
 
     # Ensure bounds are valid
     x1 = max(0, min(x1, image.width))
@@ -69,10 +145,14 @@ def crop_region(image_path: str, output_path: str, x1: int, y1: int, x2: int, y2
     x2 = max(x1, min(x2, image.width))
     y2 = max(y1, min(y2, image.height))
 
-    cropped = image.crop((x1, y1, x2, y2))
-
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    cropped.save(output_path)
+
+    if vips is not None:
+        cropped = image.crop(x1, y1, x2 - x1, y2 - y1)
+        _io_pool.submit(cropped.write_to_file, output_path)
+    else:
+        cropped = image.crop((x1, y1, x2, y2))
+        _io_pool.submit(cropped.save, output_path)
 
     return {
         "file": output_path,
@@ -93,23 +173,35 @@ def split_spread(image_path: str, output_dir: str, split_x: int) -> dict:
     Returns:
         Dict with paths to left and right page images
     """
-    image = Image.open(image_path)
-    width, height = image.size
+    vips = _vips()
+    if vips is not None:
+        image = vips.Image.new_from_file(image_path, access="sequential")
+        width, height = image.width, image.height
+    else:
+        image = _open_cached(image_path)
+        width, height = image.size
 
     # Ensure split_x is valid
     split_x = max(1, min(split_x, width - 1))
 
-    left_page = image.crop((0, 0, split_x, height))
-    right_page = image.crop((split_x, 0, width, height))
-
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
     left_path = output_path / "left.png"
     right_path = output_path / "right.png"
 
-    left_page.save(left_path)
-    right_page.save(right_path)
+    if vips is not None:
+        # Sequential images can only be scanned once; open per half.
+        left_page = image.crop(0, 0, split_x, height)
+        right_page = vips.Image.new_from_file(image_path, access="sequential").crop(
+            split_x, 0, width - split_x, height)
+        _io_pool.submit(left_page.write_to_file, str(left_path))
+        _io_pool.submit(right_page.write_to_file, str(right_path))
+    else:
+        left_page = image.crop((0, 0, split_x, height))
+        right_page = image.crop((split_x, 0, width, height))
+        _io_pool.submit(left_page.save, left_path)
+        _io_pool.submit(right_page.save, right_path)
 
     return {
         "left": {
@@ -130,10 +222,152 @@ def split_spread(image_path: str, output_dir: str, split_x: int) -> dict:
 # AI-powered operations (uses Gemini)
 # =============================================================================
 
+def _loads(text: str):
+    """Parse a Gemini JSON response, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+@dataclass
+class Box:
+    """One inline-illustration detection, normalized 0-1000 coordinates."""
+    box_2d: list
+    label: str = ""
+    mask: str = ""
+
+
+class _ChunkReader:
+    """Minimal file-like over an iterator of str chunks, teeing the raw text.
+
+    Lets ijson parse a Gemini response stream incrementally while the complete
+    response text is still captured for the disk cache.
+    """
+
+    def __init__(self, chunk_iter, sink):
+        self._iter = chunk_iter
+        self._sink = sink
+        self._buf = b""
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buf) < size:
+            chunk = next(self._iter, None)
+            if chunk is None:
+                break
+            self._sink.append(chunk)
+            self._buf += chunk.encode("utf-8")
+        if size < 0:
+            out, self._buf = self._buf, b""
+        else:
+            out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+
+_CLIENT = None
+
+
 def _get_genai_client():
-    """Lazy import and create Gemini client."""
-    from google import genai
-    return genai.Client()
+    """Lazy import and create the Gemini client once per process.
+
+    Reusing one client keeps the HTTP connection pool alive across calls, so a
+    batch run pays for credential loading and transport setup only once.
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        from google import genai
+        _CLIENT = genai.Client(http_options={"timeout": 60_000})
+    return _CLIENT
+
+
+# Gemini returns normalized 0-1000 coordinates, so anything beyond ~1024 px on
+# the long edge is wasted upload bandwidth and image tokens.
+_API_MAX_EDGE = 1024
+
+
+@functools.lru_cache(maxsize=8)
+def _prepare_api_image_cached(path: str, mtime: float) -> bytes:
+    image = Image.open(path)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    image.thumbnail((_API_MAX_EDGE, _API_MAX_EDGE), Image.LANCZOS)
+    buf = BytesIO()
+    image.save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+def _prepare_api_image(image_path: str) -> bytes:
+    """Downscale a page to a compact JPEG for the Gemini request.
+
+    The full-resolution image is only needed for the local crops; the model
+    sees a <=1024px copy, which cuts image tokens 3-10x on a page scan. The
+    result is memoized on (path, mtime) so margin detection and inline
+    extraction on the same page decode and downscale it only once.
+    """
+    return _prepare_api_image_cached(image_path, os.path.getmtime(image_path))
+
+
+def _image_part(image_bytes: bytes):
+    """Build a Gemini content part from prepared (downscaled JPEG) bytes."""
+    from google.genai import types
+    return types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg")
+
+
+# Content-addressed cache of raw Gemini responses. The key covers the prepared
+# image bytes, the full prompt and the model id, so prompt or model changes
+# invalidate automatically. Re-running margin/inline on the same page skips the
+# network round-trip entirely.
+_LLM_CACHE_DIR = Path("~/.cache/pensvm/llm").expanduser()
+_MODEL_ID = "gemini-2.5-flash"
+
+
+def _llm_cache_key(image_bytes: bytes, prompt: str) -> str:
+    return hashlib.sha256(image_bytes + prompt.encode() + _MODEL_ID.encode()).hexdigest()
+
+
+def _llm_cache_get(key: str):
+    try:
+        return (_LLM_CACHE_DIR / f"{key}.json").read_text()
+    except OSError:
+        return None
+
+
+def _llm_cache_put(key: str, text: str):
+    try:
+        _LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        (_LLM_CACHE_DIR / f"{key}.json").write_text(text)
+    except OSError:
+        pass  # cache is best-effort
+
+
+# Server-enforced response shapes. With a schema in the request config the model
+# cannot emit free-form prose or extra keys, so the prompts only need to state
+# the layout rules, not JSON formatting instructions - fewer input tokens per
+# call and no decode tokens wasted on boilerplate.
+_MARGIN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "margin_x": {"type": "integer"},
+        "confidence": {"type": "string", "enum": ["high", "medium", "low"]},
+    },
+    "required": ["margin_x"],
+}
+
+_BOXES_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "box_2d": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "minItems": 4,
+                "maxItems": 4,
+            },
+            "label": {"type": "string"},
+        },
+        "required": ["box_2d"],
+    },
+}
 
 
 def detect_margin_boundary(image_path: str, side: str = "left") -> int:
@@ -146,64 +380,236 @@ def detect_margin_boundary(image_path: str, side: str = "left") -> int:
     Returns:
         The x-coordinate (in pixels) of the margin boundary, or None if detection fails
     """
-    client = _get_genai_client()
-    image = Image.open(image_path)
-    width, height = image.size
+    width, height = _peek_size(image_path)
 
     if side == "left":
-        prompt = """Analyze this LLPSI (Lingua Latina) textbook page layout.
+        prompt = """LLPSI textbook page. "margin_x" is the x-coordinate (normalized \
+0-1000) of the RIGHT edge of the LEFT margin column (vocabulary illustrations, \
+labels, notes) - i.e. where the main Latin prose block begins."""
+    else:  # right margin
+        prompt = """LLPSI textbook page. "margin_x" is the x-coordinate (normalized \
+0-1000) of the LEFT edge of the RIGHT margin column (vocabulary illustrations, \
+labels, notes) - i.e. where the main Latin prose block ends. Be conservative: \
+if vocabulary notes or illustrations extend left, include them in the margin."""
+
+    try:
+        image_bytes = _prepare_api_image(image_path)
+        cache_key = _llm_cache_key(image_bytes, prompt)
+        text = _llm_cache_get(cache_key)
+        if text is None:
+            response = _get_genai_client().models.generate_content(
+                model=_MODEL_ID,
+                contents=[_image_part(image_bytes), prompt],
+                config={
+                    "response_mime_type": "application/json",
+                    "response_schema": _MARGIN_SCHEMA,
+                    "thinking_config": {"thinking_budget": 0}
+                }
+            )
+            text = response.text
+            _llm_cache_put(cache_key, text)
+
+        result = _loads(text)
+        margin_x_normalized = result.get("margin_x", 250 if side == "left" else 750)
 
-Find the RIGHT EDGE of the LEFT MARGIN COLUMN - this is the vertical line that separates:
-- LEFT: The margin area (contains vocabulary illustrations, labels, notes)
-- RIGHT: The main text area (contains the Latin prose paragraphs)
+        # Convert normalized (0-1000) to pixels
+        margin_x_pixels = int(margin_x_normalized * width / 1000)
 
-The margin boundary is typically where the main text block begins.
+        return margin_x_pixels
 
-Return a JSON object with:
-- "margin_x": the x-coordinate (normalized 0-1000) of the right edge of the left margin column
-- "confidence": "high", "medium", or "low"
+    except Exception as e:
+        print(f"Warning: Margin detection failed: {e}", file=sys.stderr)
+        return None
+
+
+# In-process memo for per-side margin detection: batch flows ask for both
+# sides of the same page, and the answer only depends on the file contents
+# and side. mtime_ns invalidates on file change; this layers on top of the
+# on-disk response cache, which still covers cross-process reuse.
+@functools.lru_cache(maxsize=256)
+def _detect_margin_cached(path: str, mtime_ns: int, side: str):
+    return detect_margin_boundary(path, side=side)
 
-Example: {"margin_x": 280, "confidence": "high"}"""
-    else:  # right margin
-        prompt = """Analyze this LLPSI (Lingua Latina) textbook page layout.
 
-Find the LEFT EDGE of the RIGHT MARGIN COLUMN - this is the vertical line that separates:
-- LEFT: The main text area (contains the Latin prose paragraphs)
-- RIGHT: The margin area (contains vocabulary illustrations, labels, notes)
+_ANALYZE_PROMPT = """Analyze this LLPSI (Lingua Latina) textbook page layout.
+
+The page has a MAIN TEXT AREA (Latin prose paragraphs) and one or two MARGIN
+COLUMNS (vocabulary illustrations with Latin labels, grammar notes).
+
+Report three things:
+1. "left_margin_x": the x-coordinate of the RIGHT EDGE of the LEFT margin
+   column (where the main text block begins), or null if there is no left margin.
+2. "right_margin_x": the x-coordinate of the LEFT EDGE of the RIGHT margin
+   column (where the main text block ends), or null if there is no right margin.
+   Be conservative - if vocabulary notes or illustrations extend left, include
+   them in the margin.
+3. "inline_illustrations": illustrations that are INSIDE the main text area
+   only - large header illustrations, maps, or scene illustrations embedded in
+   the prose. NEVER include margin vocabulary illustrations (small images with
+   a Latin label like "equus" next to them). When in doubt, leave it out.
+
+All coordinates normalized 0-1000. Return a JSON object:
+{"left_margin_x": 280, "right_margin_x": 720,
+ "inline_illustrations": [{"box_2d": [ymin, xmin, ymax, xmax], "label": "..."}]}"""
+
+_INLINE_PROMPT_TPL = """LLPSI textbook page: a main Latin prose area plus margin column(s) of \
+small vocabulary illustrations with Latin labels (e.g. "equus").
+
+Detect ONLY large illustrations inside the main text area \
+({left_boundary} <= x <= {right_boundary}, normalized 0-1000): header \
+illustrations, maps, and scene illustrations embedded in the prose.
+{exclusion_text}
+NEVER include margin vocabulary illustrations, grammar notes, or anything with \
+a Latin label next to it; when in doubt, leave it out. "box_2d" is \
+[ymin, xmin, ymax, xmax]. Return [] if none."""
+
+
+@functools.lru_cache(maxsize=8)
+def _inline_prompt(left_boundary: int, right_boundary: int, exclusion_text: str) -> str:
+    """Specialize the inline-detection prompt for one boundary pair.
+
+    A whole book typically has only one or two distinct boundary pairs, and a
+    byte-identical prompt keeps both the local response cache and any
+    server-side prompt caching hitting across pages.
+    """
+    return _INLINE_PROMPT_TPL.format(
+        left_boundary=left_boundary,
+        right_boundary=right_boundary,
+        exclusion_text=exclusion_text,
+    )
 
-The margin boundary is typically where the main text block ends and margin notes/illustrations begin.
-Be conservative - if vocabulary notes or illustrations extend left, include them in the margin.
 
-Return a JSON object with:
-- "margin_x": the x-coordinate (normalized 0-1000) of the left edge of the right margin column
-- "confidence": "high", "medium", or "low"
+_EMPTY_ANALYSIS = {"left_margin_x": None, "right_margin_x": None, "detections": []}
 
-Example: {"margin_x": 720, "confidence": "high"}"""
+
+def _parse_analysis(result: dict, width: int) -> dict:
+    """Convert a raw combined-analysis response into the analysis dict."""
+    def to_px(value):
+        if isinstance(value, (int, float)):
+            return int(value * width / 1000)
+        return None
+
+    return {
+        "left_margin_x": to_px(result.get("left_margin_x")),
+        "right_margin_x": to_px(result.get("right_margin_x")),
+        "detections": result.get("inline_illustrations") or [],
+    }
+
+
+def analyze_page(image_path: str) -> dict:
+    """Detect both margin boundaries and inline illustrations in one request.
+
+    A page normally needs three Gemini round-trips (left margin, right margin,
+    inline illustrations), each re-uploading the same image. One combined
+    request returns everything at once; crop_margin_strip and
+    extract_inline_illustrations accept the result via their analysis=
+    parameter.
+
+    Returns:
+        Dict with "left_margin_x" / "right_margin_x" in pixels (None if not
+        detected) and "detections": raw inline boxes (normalized 0-1000)
+    """
+    width, _ = _peek_size(image_path)
 
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[image, prompt],
-            config={
-                "response_mime_type": "application/json",
-                "thinking_config": {"thinking_budget": 0}
-            }
-        )
+        image_bytes = _prepare_api_image(image_path)
+        cache_key = _llm_cache_key(image_bytes, _ANALYZE_PROMPT)
+        text = _llm_cache_get(cache_key)
+        if text is None:
+            response = _get_genai_client().models.generate_content(
+                model=_MODEL_ID,
+                contents=[_image_part(image_bytes), _ANALYZE_PROMPT],
+                config={
+                    "response_mime_type": "application/json",
+                    "thinking_config": {"thinking_budget": 0}
+                }
+            )
+            text = response.text
+            _llm_cache_put(cache_key, text)
+        result = _loads(text)
+    except Exception as e:
+        print(f"Warning: Page analysis failed: {e}", file=sys.stderr)
+        return dict(_EMPTY_ANALYSIS)
 
-        result = json.loads(response.text)
-        margin_x_normalized = result.get("margin_x", 250 if side == "left" else 750)
+    return _parse_analysis(result, width)
 
-        # Convert normalized (0-1000) to pixels
-        margin_x_pixels = int(margin_x_normalized * width / 1000)
 
-        return margin_x_pixels
+async def analyze_page_async(image_path: str, semaphore: asyncio.Semaphore) -> dict:
+    """Async analyze_page for batch mode; shares the prompt, cache and parsing.
 
+    The semaphore caps in-flight Gemini requests; everything else (JPEG
+    downscale, cache probe) runs in worker threads so the event loop stays
+    free to drive the other pages.
+    """
+    width, _ = _peek_size(image_path)
+
+    try:
+        image_bytes = await asyncio.to_thread(_prepare_api_image, image_path)
+        cache_key = _llm_cache_key(image_bytes, _ANALYZE_PROMPT)
+        text = _llm_cache_get(cache_key)
+        if text is None:
+            async with semaphore:
+                response = await _get_genai_client().aio.models.generate_content(
+                    model=_MODEL_ID,
+                    contents=[_image_part(image_bytes), _ANALYZE_PROMPT],
+                    config={
+                        "response_mime_type": "application/json",
+                        "thinking_config": {"thinking_budget": 0}
+                    }
+                )
+            text = response.text
+            _llm_cache_put(cache_key, text)
+        result = _loads(text)
     except Exception as e:
-        print(f"Warning: Margin detection failed: {e}", file=sys.stderr)
-        return None
+        print(f"Warning: Page analysis failed for {image_path}: {e}", file=sys.stderr)
+        return dict(_EMPTY_ANALYSIS)
 
+    return _parse_analysis(result, width)
 
-def crop_margin_strip(image_path: str, output_path: str, side: str = "left", use_ai: bool = True) -> dict:
+
+def _emit_page_outputs(image_path: str, output_dir: str, analysis: dict) -> dict:
+    """Crop both margin strips and extract inline illustrations from one analysis."""
+    out = Path(output_dir)
+    left = crop_margin_strip(image_path, str(out / "margin-left.png"), side="left", analysis=analysis)
+    right = crop_margin_strip(image_path, str(out / "margin-right.png"), side="right", analysis=analysis)
+    inline = extract_inline_illustrations(
+        image_path, output_dir,
+        exclude_left=left["margin_x"], exclude_right=right["margin_x"],
+        analysis=analysis)
+    return {
+        "margin_strips": {"left": left, "right": right},
+        "inline_illustrations": inline
+    }
+
+
+async def process_pages_async(image_paths: list, output_root: str, concurrency: int = 5) -> dict:
+    """Process many pages concurrently; the pipeline is latency-bound on Gemini.
+
+    Each page gets its own subdirectory under output_root. PIL crop/save work
+    runs via asyncio.to_thread so it never blocks the event loop.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    # Caps pages holding a full-resolution decode at once; sized to the
+    # _open_cached LRU so prefetched decodes are never evicted before use.
+    pages_in_flight = asyncio.Semaphore(min(concurrency, 8))
+
+    async def one(path):
+        async with pages_in_flight:
+            # Warm the full-res decode while this page's Gemini request is in
+            # flight: _emit_page_outputs hits _open_cached right after, so the
+            # JPEG decode cost hides behind the network round-trip.
+            prefetch = asyncio.create_task(asyncio.to_thread(_open_cached, str(path)))
+            analysis = await analyze_page_async(str(path), semaphore)
+            out_dir = str(Path(output_root) / Path(path).stem)
+            await prefetch
+            return await asyncio.to_thread(_emit_page_outputs, str(path), out_dir, analysis)
+
+    results = await asyncio.gather(*[one(p) for p in image_paths])
+    return {str(Path(p).name): r for p, r in zip(image_paths, results)}
+
+
+def crop_margin_strip(image_path: str, output_path: str, side: str = "left", use_ai: bool = True,
+                      analysis: dict = None) -> dict:
     """Crop a margin column using Gemini to detect the boundary.
 
     The margin column in LLPSI pages contains both illustrations and text labels.
@@ -214,19 +620,30 @@ def crop_margin_strip(image_path: str, output_path: str, side: str = "left", use
         output_path: Path to save the cropped margin strip
         side: "left" for left margin, "right" for right margin
         use_ai: If True, use Gemini to detect margin boundary; otherwise use fixed ratio
+        analysis: Optional analyze_page() result; reuses its margin instead of
+            issuing a separate Gemini call
 
     Returns:
         Dict with output path and margin boundary info
     """
-    image = Image.open(image_path)
-    width, height = image.size
+    vips = _vips()
+    if vips is not None:
+        image = vips.Image.new_from_file(image_path, access="sequential")
+    else:
+        image = _open_cached(image_path)
+    width, height = image.width, image.height
 
     margin_x = None
     detection_method = "fallback"
 
-    if use_ai:
+    if analysis is not None:
+        margin_x = analysis.get(f"{side}_margin_x")
+        if margin_x:
+            detection_method = "gemini"
+    elif use_ai:
         try:
-            margin_x = detect_margin_boundary(image_path, side=side)
+            margin_x = _detect_margin_cached(
+                image_path, os.stat(image_path).st_mtime_ns, side)
             if margin_x:
                 detection_method = "gemini"
         except Exception as e:
@@ -241,16 +658,16 @@ def crop_margin_strip(image_path: str, output_path: str, side: str = "left", use
             margin_x = int(width * (1 - DEFAULT_MARGIN_RATIO))
         detection_method = "fallback"
 
-    # Crop margin column
-    if side == "left":
-        # Left margin: (0, 0) to (margin_x, height)
-        margin = image.crop((0, 0, margin_x, height))
-    else:
-        # Right margin: (margin_x, 0) to (width, height)
-        margin = image.crop((margin_x, 0, width, height))
+    # Crop margin column: left is (0, 0)-(margin_x, height), right is
+    # (margin_x, 0)-(width, height)
+    x0 = 0 if side == "left" else margin_x
+    x1 = margin_x if side == "left" else width
 
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    margin.save(output_path)
+    if vips is not None:
+        image.crop(x0, 0, x1 - x0, height).write_to_file(output_path)
+    else:
+        image.crop((x0, 0, x1, height)).save(output_path)
 
     return {
         "file": output_path,
@@ -261,7 +678,8 @@ def crop_margin_strip(image_path: str, output_path: str, side: str = "left", use
     }
 
 
-def extract_inline_illustrations(image_path: str, output_dir: str, exclude_left: int = None, exclude_right: int = None) -> list:
+def extract_inline_illustrations(image_path: str, output_dir: str, exclude_left: int = None,
+                                 exclude_right: int = None, analysis: dict = None) -> list:
     """Extract inline illustrations from the main text area only.
 
     Uses Gemini to detect header illustrations, scene illustrations, and other
@@ -272,15 +690,21 @@ def extract_inline_illustrations(image_path: str, output_dir: str, exclude_left:
         output_dir: Directory to save extracted illustrations
         exclude_left: Exclude content where x < this value (left margin boundary in pixels)
         exclude_right: Exclude content where x > this value (right margin boundary in pixels)
+        analysis: Optional analyze_page() result; reuses its detections instead
+            of issuing a separate Gemini call
 
     Returns:
         List of dicts with index, label, file path, and bounding box info
     """
-    client = _get_genai_client()  # Uses GOOGLE_API_KEY env var
-
-    image = Image.open(image_path)
+    image = _open_cached(image_path)
     width, height = image.size
 
+    # Random-access vips handle for maskless crops: only each box's scanlines
+    # are decoded, instead of materializing the whole page per crop. PIL stays
+    # lazy until a mask forces full-image compositing.
+    vips = _vips()
+    vips_image = vips.Image.new_from_file(image_path) if vips is not None else None
+
     # Build exclusion zones for the prompt
     exclusion_rules = []
     left_boundary = 0
@@ -298,103 +722,92 @@ def extract_inline_illustrations(image_path: str, output_dir: str, exclude_left:
 
     exclusion_text = "\n".join(exclusion_rules) if exclusion_rules else "- No margins to exclude"
 
-    prompt = f"""Detect inline illustrations in the MAIN TEXT AREA of this LLPSI (Lingua Latina) textbook page.
-
-This is a Latin textbook page. It has TWO distinct areas:
-1. MAIN TEXT AREA: Contains Latin prose paragraphs and large scene illustrations
-2. MARGIN COLUMN: Contains vocabulary aids - small illustrations with Latin labels below them
-
-MARGIN CONTENT TO NEVER EXTRACT (typically on left OR right edge of page):
-- Small vocabulary illustrations (single objects, people, or scenes)
-- Illustrations with Latin vocabulary labels directly below them (e.g., "equus", "lectica", "servus")
-- Grammar notes and explanations
-- Small diagrams showing word relationships (arrows, equals signs)
-- Any illustration that has explanatory Latin text immediately adjacent to it
-
-COORDINATE-BASED EXCLUSION ZONES:
-{exclusion_text}
-
-ONLY EXTRACT these from the MAIN TEXT AREA ({left_boundary} <= x <= {right_boundary}):
-- Large header illustrations (maps, wide scene illustrations at top of page, spanning most of text width)
-- Large scene illustrations embedded within Latin prose (showing multiple characters in action)
-- Full-width diagrams or maps that are part of the lesson narrative
-
-CRITICAL RULES:
-1. If an illustration has a Latin vocabulary word as a label (like "equus", "via", "porta"), it is MARGIN CONTENT - DO NOT extract
-2. If an illustration is small and positioned at the edge of the page, it is MARGIN CONTENT - DO NOT extract
-3. Only extract illustrations that are clearly WITHIN the main text column, not at the edges
-4. When in doubt, DO NOT extract - it's better to miss an illustration than to extract margin vocabulary
-
-Output JSON list with "box_2d" [ymin, xmin, ymax, xmax] normalized 0-1000 and "label" describing the illustration.
-Only include illustrations where {left_boundary} <= xmin AND xmax <= {right_boundary}.
-Return empty list [] if no valid main-text illustrations are found.
-Do NOT include masks."""
-
-    # Use streaming to avoid truncation of large base64 mask responses
-    response_stream = client.models.generate_content_stream(
-        model="gemini-2.5-flash",
-        contents=[image, prompt],
-        config={
-            "response_mime_type": "application/json",
-            "thinking_config": {"thinking_budget": 0}  # Disable for better masks
-        }
-    )
-
-    # Accumulate all chunks from stream
-    chunks = []
-    for chunk in response_stream:
-        if chunk.text:
-            chunks.append(chunk.text)
-    text = "".join(chunks)
+    if analysis is not None:
+        detections = analysis.get("detections", [])
+    else:
+        prompt = _inline_prompt(left_boundary, right_boundary, exclusion_text)
+
+        image_bytes = _prepare_api_image(image_path)
+        cache_key = _llm_cache_key(image_bytes, prompt)
+        text = _llm_cache_get(cache_key)
+        if text is None:
+            client = _get_genai_client()  # Uses GOOGLE_API_KEY env var
+
+            # Use streaming to avoid truncation of large base64 mask responses
+            response_stream = client.models.generate_content_stream(
+                model=_MODEL_ID,
+                contents=[_image_part(image_bytes), prompt],
+                config={
+                    "response_mime_type": "application/json",
+                    "response_schema": _BOXES_SCHEMA,
+                    "thinking_config": {"thinking_budget": 0}
+                }
+            )
+            chunk_iter = (chunk.text for chunk in response_stream if chunk.text)
+
+            if ijson is not None:
+                # Parse boxes as they arrive: cropping box K below overlaps the
+                # model still generating box K+1. The reader tees the raw text
+                # so the cache still gets the complete response on success.
+                chunks = []
+                reader = _ChunkReader(chunk_iter, chunks)
+
+                def streamed_detections():
+                    try:
+                        yield from ijson.items(reader, "item")
+                    except ijson.JSONError as e:
+                        print(f"Warning: Gemini stream stopped at invalid JSON: {e}", file=sys.stderr)
+                        return  # keep boxes parsed so far; don't cache the partial text
+                    _llm_cache_put(cache_key, "".join(chunks))
+
+                detections = streamed_detections()
+            else:
+                text = "".join(chunk_iter)
+                _llm_cache_put(cache_key, text)
 
-    # Parse the response
-    try:
-        detections = json.loads(text)
-    except json.JSONDecodeError:
-        print(f"Warning: Could not parse Gemini response as JSON", file=sys.stderr)
-        print(f"Response: {text[:500]}", file=sys.stderr)
-        return []
+        if text is not None:
+            # Parse the response
+            try:
+                detections = _loads(text)
+            except json.JSONDecodeError:
+                print(f"Warning: Could not parse Gemini response as JSON", file=sys.stderr)
+                print(f"Response: {text[:500]}", file=sys.stderr)
+                return []
 
-    if not isinstance(detections, list):
-        print(f"Warning: Expected list but got {type(detections)}", file=sys.stderr)
-        return []
+            if not isinstance(detections, list):
+                print(f"Warning: Expected list but got {type(detections)}", file=sys.stderr)
+                return []
 
-    results = []
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    for i, item in enumerate(detections):
-        if "box_2d" not in item:
-            print(f"Warning: Item {i} missing box_2d, skipping", file=sys.stderr)
-            continue
-
-        y0, x0, y1, x1 = item["box_2d"]
-
-        # Skip items that are in margin areas
-        if x0 < left_boundary:
-            print(f"Skipping item {i} in left margin (x0={x0} < {left_boundary})", file=sys.stderr)
-            continue
-        if x1 > right_boundary:
-            print(f"Skipping item {i} in right margin (x1={x1} > {right_boundary})", file=sys.stderr)
-            continue
+    def process_box(i, det, box, out_file):
+        """Crop one box, composite its mask if any, and write the PNG.
 
-        # Convert normalized coordinates (0-1000) to pixels
-        px_x0 = int(x0 * width / 1000)
-        px_y0 = int(y0 * height / 1000)
-        px_x1 = int(x1 * width / 1000)
-        px_y1 = int(y1 * height / 1000)
+        Each box is independent and PIL/libvips release the GIL around the
+        decode/encode work, so these run on a thread pool below.
+        """
+        px_x0, px_y0, px_x1, px_y1 = box
+        mask_data = det.mask
 
-        # Ensure valid bounds
-        px_x0 = max(0, min(px_x0, width - 1))
-        px_y0 = max(0, min(px_y0, height - 1))
-        px_x1 = max(px_x0 + 1, min(px_x1, width))
-        px_y1 = max(px_y0 + 1, min(px_y1, height))
+        if not mask_data and vips_image is not None:
+            # Streaming crop: decode only this box and write it out directly
+            vips_image.crop(px_x0, px_y0, px_x1 - px_x0, px_y1 - px_y0) \
+                .write_to_file(str(out_file))
+            return
 
         # Crop original image to bounding box
-        cropped = image.crop((px_x0, px_y0, px_x1, px_y1)).convert("RGBA")
+        cropped = image.crop((px_x0, px_y0, px_x1, px_y1))
+
+        if not mask_data:
+            # No alpha needed: keep the source mode (RGBA would add a quarter
+            # more pixels to encode) and trade ~20% file size for a ~3x faster
+            # zlib pass - these are intermediate extracts, not deliverables.
+            cropped.save(out_file, optimize=False, compress_level=1)
+            return
 
-        # Decode and apply mask if present
-        mask_data = item.get("mask", "")
+        # Decode and apply mask
+        cropped = cropped.convert("RGBA")
         if mask_data:
             try:
                 # Handle data URL format
@@ -404,11 +817,21 @@ Do NOT include masks."""
                 mask_bytes = base64.b64decode(mask_data)
                 mask_img = Image.open(BytesIO(mask_bytes)).convert("L")
 
-                # Resize mask to match crop dimensions
-                mask_img = mask_img.resize(cropped.size, Image.LANCZOS)
+                # Resize mask to match crop dimensions. Bilinear is enough:
+                # the threshold below discards any interpolation detail (and
+                # Lanczos ringing), so the binarized result is identical at a
+                # fraction of the resampling cost.
+                mask_img = mask_img.resize(cropped.size, Image.BILINEAR)
 
                 # Binarize at threshold 127
-                mask_img = mask_img.point(lambda p: 255 if p > 127 else 0)
+                if np is not None:
+                    # One SIMD pass instead of a per-pixel Python lambda
+                    mask_arr = np.asarray(mask_img)
+                    mask_img = Image.fromarray(
+                        np.where(mask_arr > 127, np.uint8(255), np.uint8(0)), "L"
+                    )
+                else:
+                    mask_img = mask_img.point(lambda p: 255 if p > 127 else 0)
 
                 # Apply as alpha channel
                 cropped.putalpha(mask_img)
@@ -416,22 +839,104 @@ Do NOT include masks."""
                 print(f"Warning: Could not apply mask for item {i}: {e}", file=sys.stderr)
                 # Continue without mask - just use cropped rectangle
 
-        # Save the extracted illustration (inline-{index}.png naming)
-        inline_index = len(results)
-        out_file = output_path / f"inline-{inline_index}.png"
         cropped.save(out_file)
 
-        results.append({
-            "index": inline_index,
-            "label": item.get("label", ""),
-            "file": str(out_file),
-            "box": {
-                "x": px_x0,
-                "y": px_y0,
-                "w": px_x1 - px_x0,
-                "h": px_y1 - px_y0
-            }
-        })
+    results = []
+    box_futures = []
+
+    def to_box(i, item):
+        """Lift one raw detection dict into a Box, or None if it is unusable."""
+        if "box_2d" not in item:
+            print(f"Warning: Item {i} missing box_2d, skipping", file=sys.stderr)
+            return None
+        return Box(item["box_2d"], item.get("label", ""), item.get("mask", ""))
+
+    def keep(i, det):
+        """Validate one detection before any pixel or PIL work is spent on it."""
+        _, x0, _, x1 = det.box_2d
+        if x0 < left_boundary:
+            print(f"Skipping item {i} in left margin (x0={x0} < {left_boundary})", file=sys.stderr)
+            return False
+        if x1 > right_boundary:
+            print(f"Skipping item {i} in right margin (x1={x1} > {right_boundary})", file=sys.stderr)
+            return False
+        return True
+
+    # Materialized detections (cache hit or analysis reuse) get lifted to Box
+    # and filtered in a pre-pass so rejected boxes cost nothing downstream; a
+    # live ijson stream is converted and filtered per item as it arrives
+    # instead, preserving the overlap with generation.
+    prefiltered = isinstance(detections, list)
+    if prefiltered:
+        detections = [
+            det for i, item in enumerate(detections)
+            if (det := to_box(i, item)) is not None and keep(i, det)
+        ]
+
+    # Normalized->pixel conversion and bounds clamping for the whole page in
+    # one vectorized step when the detections are already materialized. The
+    # live stream keeps the scalar math: batching it would forfeit the
+    # crop/generation overlap, and a page has tens of boxes at most.
+    pixel_boxes = None
+    if np is not None and prefiltered and detections:
+        coords = np.array([d.box_2d for d in detections], dtype=np.int64)
+        scaled = coords * (height, width, height, width) // 1000
+        x0s = np.clip(scaled[:, 1], 0, width - 1)
+        y0s = np.clip(scaled[:, 0], 0, height - 1)
+        x1s = np.maximum(x0s + 1, np.minimum(scaled[:, 3], width))
+        y1s = np.maximum(y0s + 1, np.minimum(scaled[:, 2], height))
+        pixel_boxes = np.stack([x0s, y0s, x1s, y1s], axis=1)
+
+    # Boxes are independent (crop + mask + encode + write), so they fan out
+    # across a thread pool; boxes from a live stream are submitted as they
+    # arrive. The pool is per-call so a failure in one page cannot wedge the
+    # shared writer pool.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as box_pool:
+        for i, item in enumerate(detections):
+            if prefiltered:
+                det = item
+            else:
+                det = to_box(i, item)
+                if det is None or not keep(i, det):
+                    continue
+
+            y0, x0, y1, x1 = det.box_2d
+
+            if pixel_boxes is not None:
+                px_x0, px_y0, px_x1, px_y1 = (int(v) for v in pixel_boxes[i])
+            else:
+                # Convert normalized coordinates (0-1000) to pixels
+                px_x0 = int(x0 * width / 1000)
+                px_y0 = int(y0 * height / 1000)
+                px_x1 = int(x1 * width / 1000)
+                px_y1 = int(y1 * height / 1000)
+
+                # Ensure valid bounds
+                px_x0 = max(0, min(px_x0, width - 1))
+                px_y0 = max(0, min(px_y0, height - 1))
+                px_x1 = max(px_x0 + 1, min(px_x1, width))
+                px_y1 = max(px_y0 + 1, min(px_y1, height))
+
+            # inline-{index}.png naming, indexed by accepted boxes
+            inline_index = len(results)
+            out_file = output_path / f"inline-{inline_index}.png"
+            box = (px_x0, px_y0, px_x1, px_y1)
+            box_futures.append(box_pool.submit(process_box, i, det, box, out_file))
+
+            results.append({
+                "index": inline_index,
+                "label": det.label,
+                "file": str(out_file),
+                "box": {
+                    "x": px_x0,
+                    "y": px_y0,
+                    "w": px_x1 - px_x0,
+                    "h": px_y1 - px_y0
+                }
+            })
+
+    for future in box_futures:
+        future.result()
 
     return results
 
@@ -446,6 +951,8 @@ if __name__ == "__main__":
         print("\nAI commands (uses Gemini - requires GOOGLE_API_KEY):", file=sys.stderr)
         print("  margin <image> <output> [--side left|right]  - Crop margin strip (Gemini detects)", file=sys.stderr)
         print("  inline <image> <dir> [--exclude-left X] [--exclude-right X]  - Extract inline illustrations", file=sys.stderr)
+        print("  page <image> <dir>                     - Margins + inline in one Gemini request", file=sys.stderr)
+        print("  batch <image_dir> <dir> [--concurrency N]  - Process all pages in a directory concurrently", file=sys.stderr)
         sys.exit(1)
 
     command = sys.argv[1]
@@ -565,7 +1072,44 @@ if __name__ == "__main__":
         result = extract_inline_illustrations(image_path, output_dir, exclude_left=exclude_left, exclude_right=exclude_right)
         print(json.dumps({"inline_illustrations": result}, indent=2))
 
+    elif command == "page":
+        if len(sys.argv) != 4:
+            print("Usage: extract_illustrations.py page <image> <output_dir>", file=sys.stderr)
+            sys.exit(1)
+        image_path = sys.argv[2]
+        output_dir = sys.argv[3]
+
+        if not Path(image_path).exists():
+            print(f"Error: Image not found: {image_path}", file=sys.stderr)
+            sys.exit(1)
+
+        # One Gemini round-trip shared by both margin crops and inline extraction
+        analysis = analyze_page(image_path)
+        print(json.dumps(_emit_page_outputs(image_path, output_dir, analysis), indent=2))
+
+    elif command == "batch":
+        if len(sys.argv) < 4:
+            print("Usage: extract_illustrations.py batch <image_dir> <output_dir> [--concurrency N]", file=sys.stderr)
+            sys.exit(1)
+        image_dir = sys.argv[2]
+        output_dir = sys.argv[3]
+
+        concurrency = 5
+        if len(sys.argv) > 5 and sys.argv[4] == "--concurrency":
+            concurrency = int(sys.argv[5])
+
+        pages = sorted(
+            p for p in Path(image_dir).iterdir()
+            if p.suffix.lower() in (".png", ".jpg", ".jpeg")
+        )
+        if not pages:
+            print(f"Error: No images found in {image_dir}", file=sys.stderr)
+            sys.exit(1)
+
+        results = asyncio.run(process_pages_async(pages, output_dir, concurrency=concurrency))
+        print(json.dumps({"pages": results}, indent=2))
+
     else:
         print(f"Unknown command: {command}", file=sys.stderr)
-        print("Use: info, crop, split, margin, or inline", file=sys.stderr)
+        print("Use: info, crop, split, margin, inline, page, or batch", file=sys.stderr)
         sys.exit(1)